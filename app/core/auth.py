@@ -3,52 +3,153 @@ Gestionnaire d'authentification JWT
 Module de gestion des tokens et authentification sécurisée
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from calendar import timegm
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from cachetools import TTLCache
+from jwt import PyJWTError as JWTError
 from fastapi import HTTPException, status
 from config.secure_config import get_config
 from app.utils.production_logger import ProductionLogger
-import secrets
+import asyncio
+import base64
+import bcrypt
+import hashlib
+import hmac
+import jwt
+import multiprocessing
+import orjson
+import os
+import threading
+import time
 
 logger = ProductionLogger(__name__)
 config = get_config()
 
+# Pool de processus dédié au hachage bcrypt (libère la boucle d'événements et le GIL),
+# créé à la première utilisation. Workers lancés via forkserver (spawn à défaut) : aucun
+# fork du processus applicatif, de ses threads (écoute des logs) ni de leurs verrous.
+_BCRYPT_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+_bcrypt_pool: Optional[ProcessPoolExecutor] = None
+_bcrypt_pool_lock = threading.Lock()
+
+def _get_bcrypt_pool() -> ProcessPoolExecutor:
+    """Retourne le pool bcrypt, créé au premier appel"""
+    global _bcrypt_pool
+    with _bcrypt_pool_lock:
+        if _bcrypt_pool is None:
+            _bcrypt_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context(_BCRYPT_START_METHOD)
+            )
+        return _bcrypt_pool
+
+def shutdown_bcrypt_pool() -> None:
+    """Arrête le pool bcrypt s'il a été créé (appelé à l'arrêt de l'application)"""
+    global _bcrypt_pool
+    with _bcrypt_pool_lock:
+        pool, _bcrypt_pool = _bcrypt_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def _hash_password(password: str, cost: int) -> str:
+    """Hache un mot de passe avec bcrypt (exécutable dans un processus du pool)"""
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(cost)).decode()
+
+def _check_password(plain_password: str, hashed_password: str) -> bool:
+    """Vérifie un mot de passe bcrypt (exécutable dans un processus du pool)"""
+    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+# Réserve d'entropie pour les JWT ID : un seul appel os.urandom pour ~256 tokens
+_JTI_BYTES = 16
+_jti_pool = bytearray()
+_jti_lock = threading.Lock()
+
+# Un processus enfant ne doit jamais réutiliser l'entropie du parent
+os.register_at_fork(after_in_child=_jti_pool.clear)
+
+def _generate_jti() -> str:
+    """Génère un identifiant de token unique (équivalent à secrets.token_urlsafe(16))"""
+    with _jti_lock:
+        if len(_jti_pool) < _JTI_BYTES:
+            _jti_pool.extend(os.urandom(4096))
+        raw = bytes(_jti_pool[-_JTI_BYTES:])
+        del _jti_pool[-_JTI_BYTES:]
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def _b64url(data: bytes) -> bytes:
+    """Encodage base64url sans padding (format des segments JWT)"""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+def _numeric_date_claims(payload: Dict[str, Any]) -> None:
+    """Convertit les claims temporels datetime en NumericDate, comme le fait jwt.encode"""
+    for claim in ("exp", "iat", "nbf"):
+        if isinstance(payload.get(claim), datetime):
+            payload[claim] = timegm(payload[claim].utctimetuple())
+
+# En-tête JWT HS256 sérialisé une seule fois (identique à celui produit par PyJWT)
+_HS256_HEADER_B64 = _b64url(orjson.dumps({"alg": "HS256", "typ": "JWT"}))
+
 class AuthManager:
     """Gestionnaire d'authentification et de tokens JWT"""
 
     def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        # Appel direct au backend bcrypt natif (sans le dispatch de passlib)
+        self._cost = config.bcrypt_cost or 12
         self.secret_key = config.jwt_secret_key
+        self._secret_bytes = self.secret_key.encode("utf-8")
         self.algorithm = config.jwt_algorithm
         self.expire_minutes = config.jwt_expire_minutes
 
+        # Cache des tokens déjà vérifiés (clé: empreinte blake2b du token)
+        self._token_cache = TTLCache(maxsize=16_384, ttl=60)
+        self._token_cache_lock = threading.Lock()
+
     def hash_password(self, password: str) -> str:
         """Hache un mot de passe"""
-        return self.pwd_context.hash(password)
+        return _hash_password(password, self._cost)
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Vérifie un mot de passe"""
-        return self.pwd_context.verify(plain_password, hashed_password)
+        return _check_password(plain_password, hashed_password)
+
+    async def hash_password_async(self, password: str) -> str:
+        """Hache un mot de passe sans bloquer la boucle d'événements"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_bcrypt_pool(), _hash_password, password, self._cost)
+
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Vérifie un mot de passe sans bloquer la boucle d'événements"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_bcrypt_pool(), _check_password, plain_password, hashed_password)
 
     def create_access_token(self, data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
         """Crée un token d'accès JWT"""
         to_encode = data.copy()
 
+        # Horodatages entiers (secondes epoch), format natif des claims JWT
+        now = int(time.time())
         if expires_delta:
-            expire = datetime.utcnow() + expires_delta
+            expire = now + int(expires_delta.total_seconds())
         else:
-            expire = datetime.utcnow() + timedelta(minutes=self.expire_minutes)
+            expire = now + self.expire_minutes * 60
 
         to_encode.update({
             "exp": expire,
-            "iat": datetime.utcnow(),
-            "jti": secrets.token_urlsafe(16)  # JWT ID unique
+            "iat": now,
+            "jti": _generate_jti()  # JWT ID unique
         })
 
         try:
-            encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+            if self.algorithm == "HS256":
+                # Chemin rapide : en-tête pré-encodé, claims via orjson, HMAC-SHA256 direct
+                _numeric_date_claims(to_encode)
+                signing_input = _HS256_HEADER_B64 + b"." + _b64url(orjson.dumps(to_encode))
+                signature = hmac.new(self._secret_bytes, signing_input, hashlib.sha256).digest()
+                encoded_jwt = (signing_input + b"." + _b64url(signature)).decode()
+            else:
+                encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
             logger.info(f"Token créé pour l'utilisateur {data.get('sub')}")
             return encoded_jwt
         except Exception as e:
@@ -61,17 +162,29 @@ class AuthManager:
     def verify_token(self, token: str) -> Dict[str, Any]:
         """Vérifie et décode un token JWT"""
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-
-            # Vérifier l'expiration
-            exp = payload.get("exp")
-            if exp is None:
-                raise JWTError("Token sans date d'expiration")
+            cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+            with self._token_cache_lock:
+                cached = self._token_cache.get(cache_key)
+            if cached is not None:
+                payload, exp = cached
+                if time.time() < exp:
+                    # Copie : le payload en cache est partagé entre toutes les requêtes
+                    return dict(payload)
+                with self._token_cache_lock:
+                    self._token_cache.pop(cache_key, None)
+
+            # PyJWT valide déjà l'expiration ; "require" rejette les tokens sans "exp"
+            payload = jwt.decode(
+                token,
+                self.secret_key,
+                algorithms=[self.algorithm],
+                options={"require": ["exp"]}
+            )
 
-            if datetime.utcnow() > datetime.fromtimestamp(exp):
-                raise JWTError("Token expiré")
+            with self._token_cache_lock:
+                self._token_cache[cache_key] = (payload, payload["exp"])
 
-            return payload
+            return dict(payload)
 
         except JWTError as e:
             logger.warning(f"Token invalide: {e}")
@@ -3,39 +3,62 @@ Configuration de la base de données
 Module de connexion et gestion de la base de données PostgreSQL
 """
 
-from sqlalchemy import create_engine, MetaData
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import QueuePool
-import asyncpg
-from databases import Database
+from typing import AsyncIterator
+import asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from config.secure_config import get_config
 from app.utils.production_logger import ProductionLogger
-import asyncio
 
 logger = ProductionLogger(__name__)
 config = get_config()
 
-# Configuration SQLAlchemy
-engine = create_engine(
-    config.database_url,
-    poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
-    pool_recycle=3600,
-    echo=config.debug
+# Drivers asynchrones associés à chaque schéma d'URL
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(url: str) -> str:
+    """Convertit une URL de base de données vers son driver asynchrone"""
+    scheme, sep, rest = url.partition("://")
+    if "+" in scheme or scheme not in _ASYNC_DRIVERS:
+        return url
+    return f"{_ASYNC_DRIVERS[scheme]}{sep}{rest}"
+
+# Nombre de connexions maintenues ouvertes (préchauffées au démarrage)
+POOL_SIZE = 10
+
+def _pool_options(url: str) -> dict:
+    """Dimensionnement du pool, sauf pour SQLite (pool sans taille ni débordement)"""
+    if url.startswith("sqlite"):
+        return {}
+    return {"pool_size": POOL_SIZE, "max_overflow": 20, "pool_recycle": 3600}
+
+# Configuration SQLAlchemy asynchrone (asyncpg, sans passage par un threadpool)
+engine = create_async_engine(
+    get_async_database_url(config.database_url),
+    pool_pre_ping=True,
+    echo=config.debug,
+    **_pool_options(config.database_url)
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
-# Configuration asynchrone
-database = Database(config.database_url)
+async def _ping() -> None:
+    """Exécute une requête triviale sur une connexion du pool"""
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
 
 async def init_db():
     """Initialise la base de données"""
     try:
-        await database.connect()
+        # Ouvre POOL_SIZE connexions en parallèle pour que le pool soit chaud
+        # avant la première rafale de requêtes (handshake TCP/TLS/auth payé une fois)
+        await asyncio.gather(*(_ping() for _ in range(POOL_SIZE)))
         logger.info("✅ Connexion à la base de données établie")
         return True
     except Exception as e:
@@ -45,23 +68,20 @@ async def init_db():
 async def close_db():
     """Ferme la connexion à la base de données"""
     try:
-        await database.disconnect()
+        await engine.dispose()
         logger.info("Base de données déconnectée")
     except Exception as e:
         logger.error(f"Erreur lors de la fermeture de la base de données: {e}")
 
-def get_db() -> Session:
+async def get_db() -> AsyncIterator[AsyncSession]:
     """Générateur de session de base de données"""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 async def test_connection() -> bool:
     """Test de connexion à la base de données"""
     try:
-        await database.fetch_one("SELECT 1")
+        await _ping()
         return True
     except Exception:
         return False
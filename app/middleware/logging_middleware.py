@@ -3,57 +3,91 @@ Middleware de logging pour FastAPI
 Enregistrement des requêtes HTTP et métriques de performance
 """
 
+import os
 import time
-import uuid
-from fastapi import Request, Response
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from fastapi import Request
+from fastapi.responses import ORJSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.utils.production_logger import ProductionLogger
-import json
+import orjson
 
 logger = ProductionLogger(__name__)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+# Préfixes des routes soumises à l'audit d'authentification (cf. main.py)
+_AUDIT_PREFIXES = ("/api/auth/",)
+
+def _fast_request_id() -> str:
+    """ID de requête aléatoire sur 64 bits (suffisant pour la corrélation des logs)"""
+    return os.urandom(8).hex()
+
+class LoggingMiddleware:
     """
-    Middleware pour logger toutes les requêtes HTTP
+    Middleware ASGI pour logger toutes les requêtes HTTP
     Inclut les métriques de performance et l'audit de sécurité
+
+    Implémenté en ASGI pur (sans BaseHTTPMiddleware) pour éviter le pont
+    de streaming anyio construit à chaque requête.
     """
 
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
 
-    async def dispatch(self, request: Request, call_next) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Traite chaque requête HTTP"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
         # Générer un ID de requête unique
-        request_id = str(uuid.uuid4())
+        request_id = _fast_request_id()
 
         # Informations de base sur la requête
-        start_time = time.time()
-        method = request.method
-        url = str(request.url)
-        client_ip = self._get_client_ip(request)
-        user_agent = request.headers.get("User-Agent", "Unknown")
-
-        # Ajouter l'ID de requête aux headers
-        request.state.request_id = request_id
+        start_time = time.perf_counter()
+        method = scope["method"]
+        # Chemin seul : évite de reconstruire l'URL complète à chaque requête
+        url = scope["path"]
+        headers = Headers(scope=scope)
+        client_ip = self._get_client_ip(scope, headers)
+        user_agent = headers.get("User-Agent", "Unknown")
+
+        # Exposer l'ID de requête aux handlers (request.state.request_id)
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        # Contexte de log unique, complété en fin de requête
+        log_data = {
+            "request_id": request_id,
+            "method": method,
+            "url": url,
+            "client_ip": client_ip,
+            "user_agent": user_agent
+        }
 
         # Logger le début de la requête
-        logger.info(
-            f"Requête {method} {url}",
-            request_id=request_id,
-            client_ip=client_ip,
-            user_agent=user_agent
-        )
-
-        # Variables pour capturer les erreurs
-        response = None
+        logger.info(f"Requête {method} {url}", extra=log_data)
+
+        # Variables pour capturer la réponse et les erreurs
+        status_code = 500
+        response_started = False
         error_occurred = False
 
+        async def send_with_headers(message: Message) -> None:
+            """Injecte les headers X-Request-ID / X-Process-Time au début de la réponse"""
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                process_time = time.perf_counter() - start_time
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-request-id", request_id.encode("latin-1")),
+                    (b"x-process-time", f"{process_time:.3f}".encode("latin-1")),
+                ]
+            await send(message)
+
         try:
             # Traiter la requête
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_headers)
 
         except Exception as e:
             error_occurred = True
@@ -64,74 +98,65 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                 error_type=type(e).__name__
             )
 
+            # Réponse déjà partiellement envoyée : impossible de la remplacer
+            if response_started:
+                raise
+
             # Créer une réponse d'erreur
-            response = JSONResponse(
+            response = ORJSONResponse(
                 status_code=500,
                 content={"detail": "Erreur interne du serveur", "request_id": request_id}
             )
+            await response(scope, receive, send_with_headers)
 
         finally:
             # Calculer la durée de traitement
-            process_time = time.time() - start_time
-
-            # Ajouter les headers de réponse
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Process-Time"] = f"{process_time:.3f}"
+            process_time = time.perf_counter() - start_time
 
             # Logger la fin de la requête
-            status_code = response.status_code if response else 500
-
-            log_data = {
-                "request_id": request_id,
-                "method": method,
-                "url": url,
-                "status_code": status_code,
-                "process_time": round(process_time, 3),
-                "client_ip": client_ip,
-                "user_agent": user_agent
-            }
+            log_data["status_code"] = status_code
+            log_data["process_time"] = round(process_time, 3)
 
             if error_occurred:
-                logger.error("Requête terminée avec erreur", **log_data)
+                logger.error("Requête terminée avec erreur", extra=log_data)
             elif status_code >= 400:
-                logger.warning(f"Requête terminée avec erreur {status_code}", **log_data)
+                logger.warning(f"Requête terminée avec erreur {status_code}", extra=log_data)
             else:
-                logger.info("Requête terminée avec succès", **log_data)
+                logger.info("Requête terminée avec succès", extra=log_data)
 
             # Logger les métriques de performance
             if process_time > 2.0:  # Requêtes lentes (> 2 secondes)
-                logger.warning(
-                    f"Requête lente détectée: {method} {url}",
-                    **log_data,
-                    performance_alert=True
-                )
+                # La query string n'est utile qu'au diagnostic des requêtes lentes
+                query_string = scope.get("query_string", b"")
+                full_url = f"{url}?{query_string.decode('latin-1')}" if query_string else url
+                log_data["performance_alert"] = True
+                logger.warning(f"Requête lente détectée: {method} {full_url}", extra=log_data)
 
             # Audit de sécurité pour certaines requêtes
-            await self._security_audit(request, response, log_data)
-
-        return response
+            await self._security_audit(method, status_code, log_data)
 
-    def _get_client_ip(self, request: Request) -> str:
+    def _get_client_ip(self, scope: Scope, headers: Headers) -> str:
         """Récupère l'IP réelle du client (gestion des proxies)"""
         # Vérifier les headers de proxy
-        forwarded_for = request.headers.get("X-Forwarded-For")
+        forwarded_for = headers.get("X-Forwarded-For")
         if forwarded_for:
             # Prendre la première IP (client original)
             return forwarded_for.split(",")[0].strip()
 
-        real_ip = request.headers.get("X-Real-IP")
+        real_ip = headers.get("X-Real-IP")
         if real_ip:
             return real_ip
 
         # IP directe
-        return request.client.host if request.client else "Unknown"
+        client = scope.get("client")
+        return client[0] if client else "Unknown"
 
-    async def _security_audit(self, request: Request, response: Response, log_data: dict):
+    async def _security_audit(self, method: str, status_code: int, log_data: dict):
         """Audit de sécurité pour certains événements"""
 
         # Tentatives d'authentification
-        if "/auth/" in str(request.url):
-            if response.status_code == 401:
+        if log_data["url"].startswith(_AUDIT_PREFIXES):
+            if status_code == 401:
                 logger.log_security_event(
                     "failed_authentication",
                     {
@@ -140,7 +165,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                         "endpoint": log_data["url"]
                     }
                 )
-            elif response.status_code == 200 and request.method == "POST":
+            elif status_code == 200 and method == "POST":
                 logger.log_security_event(
                     "successful_authentication",
                     {
@@ -150,7 +175,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                 )
 
         # Tentatives d'accès aux endpoints protégés
-        if response.status_code == 403:
+        if status_code == 403:
             logger.log_security_event(
                 "forbidden_access_attempt",
                 {
@@ -161,7 +186,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             )
 
         # Requêtes suspectes (trop d'erreurs 4xx)
-        if 400 <= response.status_code < 500:
+        if 400 <= status_code < 500:
             # En production, on pourrait implémenter un compteur
             # pour détecter les patterns d'attaque
             pass
@@ -172,7 +197,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             if request.headers.get("Content-Type", "").startswith("application/json"):
                 body = await request.body()
                 if body:
-                    return json.loads(body.decode())
+                    return orjson.loads(body)
         except Exception as e:
             logger.warning(f"Impossible de lire le body de la requête: {e}")
 
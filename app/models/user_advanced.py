@@ -5,12 +5,20 @@ Module complémentaire pour la gestion fine des profils utilisateurs
 
 from typing import Optional, Dict, List, Any
 from datetime import datetime, timedelta
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator
 from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Text
 from sqlalchemy.ext.declarative import declarative_base
 from app.utils.production_logger import ProductionLogger
+import base64
 import bcrypt
 import json
+import secrets
+
+# 2FA optionnelle : pyotp est importé une seule fois au chargement du module
+try:
+    import pyotp
+except ImportError:
+    pyotp = None
 
 Base = declarative_base()
 logger = ProductionLogger(__name__)
@@ -53,14 +61,16 @@ class UserPreferences(BaseModel):
     notifications_email: bool = Field(default=True, description="Notifications par email")
     notifications_sms: bool = Field(default=False, description="Notifications par SMS")
 
-    @validator('language')
+    @field_validator('language')
+    @classmethod
     def validate_language(cls, v):
         allowed_languages = ['fr', 'en', 'es', 'de', 'it']
         if v not in allowed_languages:
             raise ValueError(f"Langue non supportée: {v}")
         return v
 
-    @validator('theme')
+    @field_validator('theme')
+    @classmethod
     def validate_theme(cls, v):
         allowed_themes = ['light', 'dark', 'auto']
         if v not in allowed_themes:
@@ -80,6 +90,11 @@ class NotificationSettings(BaseModel):
     quiet_hours_start: Optional[str] = Field(default="22:00", description="Début heures silencieuses")
     quiet_hours_end: Optional[str] = Field(default="08:00", description="Fin heures silencieuses")
 
+# Valeurs par défaut sérialisées une seule fois : elles sont statiques,
+# inutile de relancer la validation Pydantic à chaque appel
+_DEFAULT_PREFS_JSON = UserPreferences().model_dump()
+_DEFAULT_NOTIFS_JSON = NotificationSettings().model_dump()
+
 class UserAdvancedService:
     """Service de gestion avancée des utilisateurs"""
 
@@ -87,8 +102,8 @@ class UserAdvancedService:
     async def create_advanced_profile(user_id: int, preferences: Optional[Dict] = None) -> Dict:
         """Crée un profil avancé pour un utilisateur"""
         try:
-            default_preferences = UserPreferences().dict()
-            default_notifications = NotificationSettings().dict()
+            default_preferences = _DEFAULT_PREFS_JSON.copy()
+            default_notifications = _DEFAULT_NOTIFS_JSON.copy()
 
             # Merge avec les préférences fournies
             if preferences:
@@ -152,9 +167,9 @@ class UserAdvancedService:
             }
 
             if success:
-                logger.info(f"Connexion réussie pour l'utilisateur {user_id}", **login_data)
+                logger.info(f"Connexion réussie pour l'utilisateur {user_id}", extra=login_data)
             else:
-                logger.warning(f"Tentative de connexion échouée pour l'utilisateur {user_id}", **login_data)
+                logger.warning(f"Tentative de connexion échouée pour l'utilisateur {user_id}", extra=login_data)
 
         except Exception as e:
             logger.error(f"Erreur lors de l'enregistrement de la tentative de connexion: {e}")
@@ -192,9 +207,11 @@ class UserAdvancedService:
     @staticmethod
     async def enable_two_factor(user_id: int) -> Dict:
         """Active l'authentification à deux facteurs"""
-        try:
-            import pyotp
+        if pyotp is None:
+            logger.error("PyOTP non installé pour l'activation 2FA")
+            return {"error": "2FA non disponible"}
 
+        try:
             # Génération du secret TOTP
             secret = pyotp.random_base32()
 
@@ -205,17 +222,19 @@ class UserAdvancedService:
                 issuer_name="VTC Management"
             )
 
+            # Codes de secours : une seule lecture CSPRNG de 50 octets,
+            # encodée en base32 (80 caractères sans padding) puis découpée en 10 x 8
+            backup_b32 = base64.b32encode(secrets.token_bytes(50)).decode()
+            backup_codes = [backup_b32[i:i + 8] for i in range(0, 80, 8)]
+
             logger.info(f"2FA activé pour l'utilisateur {user_id}")
 
             return {
                 "secret": secret,
                 "qr_uri": provisioning_uri,
-                "backup_codes": [pyotp.random_base32()[:8] for _ in range(10)]
+                "backup_codes": backup_codes
             }
 
-        except ImportError:
-            logger.error("PyOTP non installé pour l'activation 2FA")
-            return {"error": "2FA non disponible"}
         except Exception as e:
             logger.error(f"Erreur lors de l'activation 2FA: {e}", user_id=user_id)
             return {"error": str(e)}
@@ -223,9 +242,11 @@ class UserAdvancedService:
     @staticmethod
     async def verify_two_factor(user_id: int, secret: str, token: str) -> bool:
         """Vérifie un token 2FA"""
-        try:
-            import pyotp
+        if pyotp is None:
+            logger.error("PyOTP non installé pour la vérification 2FA")
+            return False
 
+        try:
             totp = pyotp.TOTP(secret)
             is_valid = totp.verify(token)
 
@@ -236,9 +257,6 @@ class UserAdvancedService:
 
             return is_valid
 
-        except ImportError:
-            logger.error("PyOTP non installé pour la vérification 2FA")
-            return False
         except Exception as e:
             logger.error(f"Erreur lors de la vérification 2FA: {e}", user_id=user_id)
             return False
@@ -246,11 +264,9 @@ class UserAdvancedService:
 # Fonctions utilitaires
 async def get_user_preferences(user_id: int) -> Dict:
     """Récupère les préférences d'un utilisateur"""
-    service = UserAdvancedService()
     # En production, ceci ferait une requête en base
-    return UserPreferences().dict()
+    return _DEFAULT_PREFS_JSON.copy()
 
 async def update_user_preferences(user_id: int, preferences: Dict) -> bool:
     """Met à jour les préférences d'un utilisateur"""
-    service = UserAdvancedService()
-    return await service.update_preferences(user_id, preferences)
+    return await UserAdvancedService.update_preferences(user_id, preferences)
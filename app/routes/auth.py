@@ -5,21 +5,37 @@ Endpoints pour la gestion des utilisateurs et l'authentification
 
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import AfterValidator, BaseModel
+from typing import Annotated, Optional
+from email_validator import EmailNotValidError, validate_email
 from app.core.auth import auth_manager
 from app.utils.production_logger import ProductionLogger
+import functools
 
 logger = ProductionLogger(__name__)
 router = APIRouter()
 security = HTTPBearer()
 
+@functools.lru_cache(maxsize=4096)
+def _normalize_email(value: str) -> str:
+    """Adresse normalisée par email-validator (mêmes règles qu'EmailStr), mise en cache"""
+    return validate_email(value, check_deliverability=False).normalized
+
+def _validate_email(value: str) -> str:
+    """Vérifie et normalise l'adresse email (domaine en minuscules, IDNA)"""
+    try:
+        return _normalize_email(value.strip())
+    except EmailNotValidError:
+        raise ValueError("Adresse email invalide")
+
+Email = Annotated[str, AfterValidator(_validate_email)]
+
 class LoginRequest(BaseModel):
-    email: EmailStr
+    email: Email
     password: str
 
 class RegisterRequest(BaseModel):
-    email: EmailStr
+    email: Email
     password: str
     first_name: str
     last_name: str
@@ -73,7 +89,7 @@ async def register(user_data: RegisterRequest):
         # Simulation d'inscription
         # En production: créer l'utilisateur en base
 
-        hashed_password = auth_manager.hash_password(user_data.password)
+        hashed_password = await auth_manager.hash_password_async(user_data.password)
 
         token_data = {
             "sub": user_data.email,
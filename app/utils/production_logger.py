@@ -1,16 +1,263 @@
 """
 Production Logger - Fix AttributeError pour logging.handlers
 Module de logging sécurisé pour l'environnement de production
+
+Les appels de log ne font qu'une mise en file (QueueHandler) ; un unique
+thread d'écoute (QueueListener) formate et écrit vers la console et le
+fichier rotatif bufferisé, hors du chemin critique des requêtes.
 """
 
+import atexit
+import functools
 import logging
 import logging.handlers  # Import explicite requis pour RotatingFileHandler
+import queue
 import sys
 import os
+import time
 from datetime import datetime
 from pathlib import Path
+from typing import Any, List, Optional
 import json
 
+try:
+    import orjson
+except ImportError:  # Repli sur la bibliothèque standard
+    orjson = None
+
+_LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# File d'attente entre les appelants et le thread d'écriture
+_QUEUE_SIZE = 8192
+
+# Écriture fichier bufferisée : flush tous les N enregistrements, après
+# _FLUSH_INTERVAL secondes d'inactivité, ou immédiatement dès WARNING
+_FILE_BUFFER_SIZE = 64 * 1024
+_FLUSH_EVERY_RECORDS = 64
+_FLUSH_INTERVAL = 0.05
+
+# Caractères de contrôle neutralisés dans les messages (une seule passe via translate)
+_CTRL_TABLE = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' '})
+_MAX_MESSAGE_LENGTH = 1000
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler avec écriture bufferisée et flush groupé
+    La taille du fichier est suivie en mémoire : ni stat() ni tell() par enregistrement
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._size = 0
+        self._pending = 0
+        super().__init__(*args, **kwargs)
+
+    def _open(self):
+        """Ouvre le fichier avec un buffer de _FILE_BUFFER_SIZE octets"""
+        stream = self._builtin_open(
+            self.baseFilename, self.mode,
+            buffering=_FILE_BUFFER_SIZE,
+            encoding=self.encoding, errors=self.errors
+        )
+        self._size = os.fstat(stream.fileno()).st_size
+        return stream
+
+    def emit(self, record):
+        """Écrit l'enregistrement (formaté une seule fois) avec rotation si nécessaire"""
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+
+            # Taille en octets encodés (et non en caractères) pour une rotation exacte
+            size = len(msg.encode(self.encoding or 'utf-8', self.errors or 'strict'))
+
+            # Vérification "fichier régulier" (bpo-45401) seulement au moment de la rotation
+            if (self.maxBytes > 0 and self._size
+                    and self._size + size >= self.maxBytes
+                    and os.path.isfile(self.baseFilename)):
+                self.doRollover()
+
+            self.stream.write(msg)
+            self._size += size
+            self._pending += 1
+
+            if record.levelno >= logging.WARNING or self._pending >= _FLUSH_EVERY_RECORDS:
+                self.flush_pending()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        """Flush différé : géré par emit() et par le thread d'écoute en période d'inactivité"""
+
+    def flush_pending(self):
+        """Force l'écriture du buffer sur disque"""
+        self.acquire()
+        try:
+            if self.stream:
+                self.stream.flush()
+            self._pending = 0
+        finally:
+            self.release()
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui ne bloque jamais l'appelant pour les logs verbeux"""
+
+    def enqueue(self, record):
+        if record.levelno >= logging.WARNING:
+            # Les avertissements et erreurs ne sont jamais perdus
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # File saturée : on abandonne les logs DEBUG/INFO plutôt que de bloquer
+            pass
+
+class _QueueListener(logging.handlers.QueueListener):
+    """QueueListener qui flush les fichiers bufferisés quand la file est inactive"""
+
+    def __init__(self, log_queue, *handlers, respect_handler_level=False):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self._buffered = [h for h in handlers if isinstance(h, BufferedRotatingFileHandler)]
+
+    def dequeue(self, block):
+        while True:
+            # Attente bornée uniquement s'il reste des données à écrire sur disque
+            pending = any(h._pending for h in self._buffered)
+            try:
+                return self.queue.get(timeout=_FLUSH_INTERVAL if pending else None)
+            except queue.Empty:
+                for handler in self._buffered:
+                    handler.flush_pending()
+
+@functools.lru_cache(maxsize=1024)
+def _format_second(second: int) -> str:
+    """Horodatage formaté d'une seconde donnée (partagé par les enregistrements de la même seconde)"""
+    return time.strftime(_DATE_FORMAT, time.localtime(second))
+
+class _CachedTimeFormatter(logging.Formatter):
+    """
+    Formatter dont l'horodatage est mis en cache à la seconde
+    Le contexte (record.ctx) n'est sérialisé qu'ici, dans le thread d'écoute
+    """
+
+    def formatTime(self, record, datefmt=None):
+        return _format_second(int(record.created))
+
+    def formatMessage(self, record):
+        message = super().formatMessage(record)
+        context = getattr(record, 'ctx', None)
+        if not context:
+            return message
+        try:
+            return f"{message} | Context: {_json_dumps(context)}"
+        except Exception:
+            return f"{message} | Context: {str(context)}"
+
+def _json_dumps(obj: Any) -> str:
+    """Sérialise en JSON (orjson si disponible, UTF-8 non échappé dans les deux cas)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, default=str, ensure_ascii=False)
+
+_handler_notice: Optional[str] = None
+
+# Fichier de log principal et repli si /var/log n'est pas accessible
+_LOG_DIR = Path("/var/log/vtc")
+_FALLBACK_LOG_PATH = Path("/tmp/vtc_app.log")
+
+def _resolve_log_path() -> Path:
+    """Choisit une seule fois le fichier de log (répertoire et fichier existant accessibles en écriture)"""
+    try:
+        _LOG_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        pass
+    log_path = _LOG_DIR / "vtc_app.log"
+    if os.access(_LOG_DIR, os.W_OK) and (not log_path.exists() or os.access(log_path, os.W_OK)):
+        return log_path
+    return _FALLBACK_LOG_PATH
+
+_LOG_PATH = _resolve_log_path()
+
+def _create_output_handlers() -> List[logging.Handler]:
+    """Crée (une seule fois) les handlers console et fichier rotatif"""
+    global _handler_notice
+
+    # Format de base
+    formatter = _CachedTimeFormatter(_LOG_FORMAT, datefmt=_DATE_FORMAT)
+
+    # Handler console
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    handlers = [console_handler]
+
+    # Handler fichier rotatif (si possible) ; repli si l'ouverture échoue malgré tout
+    candidates = [_LOG_PATH] if _LOG_PATH == _FALLBACK_LOG_PATH else [_LOG_PATH, _FALLBACK_LOG_PATH]
+    for log_path in candidates:
+        is_fallback = log_path == _FALLBACK_LOG_PATH
+        try:
+            # Fix AttributeError: Import explicite résolu le problème
+            file_handler = BufferedRotatingFileHandler(
+                log_path,
+                maxBytes=(5 if is_fallback else 10)*1024*1024,  # 5MB en repli, 10MB sinon
+                backupCount=2 if is_fallback else 5,
+                encoding='utf-8'
+            )
+        except OSError as e:
+            _handler_notice = f"Impossible de configurer le logging fichier: {e}"
+            continue
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+        if is_fallback:
+            _handler_notice = f"Utilisation du répertoire de log fallback: {log_path}"
+        break
+
+    return handlers
+
+_LOG_QUEUE: queue.Queue = queue.Queue(maxsize=_QUEUE_SIZE)
+_LISTENER = _QueueListener(_LOG_QUEUE, *_create_output_handlers(), respect_handler_level=True)
+_LISTENER.start()
+# Vidage de la file à l'arrêt (exécuté avant logging.shutdown, qui ferme les fichiers)
+atexit.register(_LISTENER.stop)
+
+def _flush_before_fork():
+    """
+    Vide les buffers fichier et garde leurs verrous jusqu'au fork : l'enfant
+    n'hérite d'aucune ligne en attente (sinon écrite une seconde fois par lui)
+    """
+    for handler in _LISTENER._buffered:
+        handler.acquire()
+        handler.flush_pending()
+
+def _release_after_fork_in_parent():
+    """Libère les verrous pris par _flush_before_fork"""
+    for handler in _LISTENER._buffered:
+        handler.release()
+
+def _restart_listener_after_fork():
+    """Le thread d'écoute n'existe pas dans un processus enfant : le relancer"""
+    # Verrous des handlers déjà réinitialisés par le module logging ; buffers vides
+    for handler in _LISTENER._buffered:
+        handler._pending = 0
+    _LOG_QUEUE.__init__(maxsize=_QUEUE_SIZE)  # verrous hérités potentiellement verrouillés
+    _LISTENER._thread = None
+    _LISTENER.start()
+
+os.register_at_fork(
+    before=_flush_before_fork,
+    after_in_parent=_release_after_fork_in_parent,
+    after_in_child=_restart_listener_after_fork
+)
+
+# Handler de mise en file partagé par tous les loggers nommés
+_QUEUE_HANDLER = _QueueHandler(_LOG_QUEUE)
+
+# Noms de loggers déjà configurés
+_INITIALIZED: set = set()
+
 class ProductionLogger:
     """
     Logger de production avec rotation des fichiers et formatage sécurisé
@@ -23,56 +270,16 @@ class ProductionLogger:
         self.logger = self._setup_logger()
 
     def _setup_logger(self):
-        """Configuration du logger avec handlers multiples"""
+        """Configuration du logger : simple mise en file vers le thread d'écoute"""
         logger = logging.getLogger(self.name)
 
         # Éviter la duplication des handlers
-        if logger.handlers:
+        if self.name in _INITIALIZED or logger.handlers:
             return logger
 
         logger.setLevel(self.log_level)
-
-        # Format de base
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-
-        # Handler console
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-
-        # Handler fichier rotatif (si possible)
-        try:
-            log_dir = Path("/var/log/vtc")
-            log_dir.mkdir(parents=True, exist_ok=True)
-
-            # Fix AttributeError: Import explicite résolu le problème
-            file_handler = logging.handlers.RotatingFileHandler(
-                log_dir / "vtc_app.log",
-                maxBytes=10*1024*1024,  # 10MB
-                backupCount=5,
-                encoding='utf-8'
-            )
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
-
-        except (PermissionError, OSError) as e:
-            # Fallback vers /tmp si /var/log n'est pas accessible
-            try:
-                fallback_log = Path("/tmp/vtc_app.log")
-                file_handler = logging.handlers.RotatingFileHandler(
-                    fallback_log,
-                    maxBytes=5*1024*1024,  # 5MB
-                    backupCount=2,
-                    encoding='utf-8'
-                )
-                file_handler.setFormatter(formatter)
-                logger.addHandler(file_handler)
-                logger.warning(f"Utilisation du répertoire de log fallback: {fallback_log}")
-            except Exception as fallback_error:
-                logger.warning(f"Impossible de configurer le logging fichier: {fallback_error}")
+        logger.addHandler(_QUEUE_HANDLER)
+        _INITIALIZED.add(self.name)
 
         return logger
 
@@ -82,84 +289,97 @@ class ProductionLogger:
             message = str(message)
 
         # Remplacer les caractères de contrôle
-        sanitized = message.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
+        sanitized = message.translate(_CTRL_TABLE)
 
         # Limiter la longueur
-        if len(sanitized) > 1000:
-            sanitized = sanitized[:997] + "..."
+        if len(sanitized) > _MAX_MESSAGE_LENGTH:
+            sanitized = sanitized[:_MAX_MESSAGE_LENGTH - 3] + "..."
 
         return sanitized
 
-    def _format_context(self, **kwargs) -> str:
-        """Formate le contexte supplémentaire"""
-        if not kwargs:
-            return ""
-
-        try:
-            context = json.dumps(kwargs, default=str, ensure_ascii=False)
-            return f" | Context: {context}"
-        except Exception:
-            return f" | Context: {str(kwargs)}"
+    def _build_extra(self, extra: Optional[dict], kwargs: dict) -> Optional[dict]:
+        """
+        Prépare le contexte supplémentaire (dict `extra` et/ou arguments nommés)
+        Copie superficielle : la sérialisation est différée au thread d'écoute
+        """
+        if kwargs:
+            context = {**extra, **kwargs} if extra else kwargs
+        elif extra:
+            context = dict(extra)
+        else:
+            return None
+        return {'ctx': context}
 
-    def debug(self, message: str, **kwargs):
+    def debug(self, message: str, extra: Optional[dict] = None, **kwargs):
         """Log niveau DEBUG"""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         clean_msg = self._sanitize_message(message)
-        context = self._format_context(**kwargs)
-        self.logger.debug(f"{clean_msg}{context}")
+        self.logger.debug(clean_msg, extra=self._build_extra(extra, kwargs))
 
-    def info(self, message: str, **kwargs):
+    def info(self, message: str, extra: Optional[dict] = None, **kwargs):
         """Log niveau INFO"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         clean_msg = self._sanitize_message(message)
-        context = self._format_context(**kwargs)
-        self.logger.info(f"{clean_msg}{context}")
+        self.logger.info(clean_msg, extra=self._build_extra(extra, kwargs))
 
-    def warning(self, message: str, **kwargs):
+    def warning(self, message: str, extra: Optional[dict] = None, **kwargs):
         """Log niveau WARNING"""
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
         clean_msg = self._sanitize_message(message)
-        context = self._format_context(**kwargs)
-        self.logger.warning(f"{clean_msg}{context}")
+        self.logger.warning(clean_msg, extra=self._build_extra(extra, kwargs))
 
-    def error(self, message: str, **kwargs):
+    def error(self, message: str, extra: Optional[dict] = None, **kwargs):
         """Log niveau ERROR"""
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
         clean_msg = self._sanitize_message(message)
-        context = self._format_context(**kwargs)
-        self.logger.error(f"{clean_msg}{context}")
+        self.logger.error(clean_msg, extra=self._build_extra(extra, kwargs))
 
-    def critical(self, message: str, **kwargs):
+    def critical(self, message: str, extra: Optional[dict] = None, **kwargs):
         """Log niveau CRITICAL"""
+        if not self.logger.isEnabledFor(logging.CRITICAL):
+            return
         clean_msg = self._sanitize_message(message)
-        context = self._format_context(**kwargs)
-        self.logger.critical(f"{clean_msg}{context}")
+        self.logger.critical(clean_msg, extra=self._build_extra(extra, kwargs))
 
     def log_security_event(self, event_type: str, details: dict = None):
         """Log spécialisé pour les événements de sécurité"""
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
         security_msg = f"SECURITY_EVENT: {event_type}"
         if details:
-            security_msg += f" - Details: {json.dumps(details, default=str)}"
+            security_msg += f" - Details: {_json_dumps(details)}"
 
         self.warning(security_msg)
 
     def log_performance(self, operation: str, duration: float, **context):
         """Log des métriques de performance"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         perf_msg = f"PERFORMANCE: {operation} completed in {duration:.3f}s"
-        self.info(perf_msg, **context)
+        self.info(perf_msg, extra=context)
 
 # Instance globale pour faciliter l'utilisation
 default_logger = ProductionLogger("vtc_app")
+if _handler_notice:
+    default_logger.warning(_handler_notice)
 
 # Fonctions de convenance
 def get_logger(name: str = None) -> ProductionLogger:
     """Obtient une instance de logger"""
     return ProductionLogger(name) if name else default_logger
 
-def log_info(message: str, **kwargs):
+def log_info(message: str, extra: Optional[dict] = None, **kwargs):
     """Log info avec le logger par défaut"""
-    default_logger.info(message, **kwargs)
+    default_logger.info(message, extra, **kwargs)
 
-def log_error(message: str, **kwargs):
+def log_error(message: str, extra: Optional[dict] = None, **kwargs):
     """Log erreur avec le logger par défaut"""
-    default_logger.error(message, **kwargs)
+    default_logger.error(message, extra, **kwargs)
 
-def log_warning(message: str, **kwargs):
+def log_warning(message: str, extra: Optional[dict] = None, **kwargs):
     """Log warning avec le logger par défaut"""
-    default_logger.warning(message, **kwargs)
+    default_logger.warning(message, extra, **kwargs)
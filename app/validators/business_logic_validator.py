@@ -3,16 +3,78 @@ Validateur de logique métier - Fix Pydantic V2
 Module de validation des règles métier avec support Pydantic V2
 """
 
-from typing import Dict, List, Optional, Any, Union
+from typing import Annotated, Dict, List, Optional, Any, Union
 from datetime import datetime, timedelta, time
 from decimal import Decimal
-from pydantic import BaseModel, Field, validator, root_validator
+from fractions import Fraction
+from pydantic import (
+    BaseModel, ConfigDict, Field, StringConstraints, ValidationInfo,
+    field_serializer, field_validator, model_validator
+)
 from enum import Enum
+import functools
 import re
+import types
 from app.utils.production_logger import ProductionLogger
 
 logger = ProductionLogger(__name__)
 
+# Expressions régulières compilées une seule fois au chargement du module
+_DIGIT_RE = re.compile(r'\d')
+_LICENSE_RE = re.compile(r'^[0-9]{12}$|^[A-Z0-9]{8,15}$')
+_PHONE_RE = re.compile(r'^(\+33|0)[1-9](\d{8})$')
+
+# Fenêtres de réservation et heures de service (5h00 - 1h00)
+_MIN_BOOK_DELTA = timedelta(minutes=15)
+_MAX_BOOK_DELTA = timedelta(days=30)
+_SERVICE_START = time(5, 0)
+_SERVICE_END = time(1, 0)
+
+# Plages horaires (heures entières) pour les multiplicateurs et la disponibilité
+_PEAK_HOURS = frozenset((7, 8, 17, 18))
+_NIGHT_HOURS = frozenset(range(22, 24)) | frozenset(range(0, 6))
+_LOW_AVAILABILITY_HOURS = frozenset(range(0, 6)) | frozenset((8, 9, 17, 18, 19, 23))
+
+# Validité maximale des documents chauffeur
+_FIVE_YEARS = timedelta(days=5*365)
+
+# Tarifs de calcul du prix final, en centimes
+_CENTS_PER_KM = 150  # 1.5€/km
+_CENTS_PER_HOUR = 2500  # 25€/h
+
+# Capacité et prix minimum par type de véhicule (clés = valeurs de VehicleType)
+_MAX_PAX = types.MappingProxyType({
+    'standard': 4,
+    'premium': 4,
+    'van': 8,
+    'luxury': 4
+})
+_MIN_PRICE = types.MappingProxyType({
+    'standard': Decimal('5.0'),
+    'premium': Decimal('8.0'),
+    'van': Decimal('12.0'),
+    'luxury': Decimal('15.0')
+})
+_DEFAULT_MIN_PRICE = _MIN_PRICE['standard']
+
+def _round_cents(value: Fraction) -> int:
+    """Arrondi au centime le plus proche (demi-centime vers le haut) d'un montant positif"""
+    return (2 * value.numerator + value.denominator) // (2 * value.denominator)
+
+@functools.lru_cache(maxsize=4096)
+def _compute_price(base_price: Decimal, distance_km: Decimal, minutes: int, multiplier: Decimal):
+    """
+    Calcul pur du prix en centimes, sur les entrées validées exactes (clés du cache)
+    Arithmétique rationnelle exacte : seul le résultat est arrondi au centime
+    """
+    distance = Fraction(distance_km) * _CENTS_PER_KM
+    duration = Fraction(minutes * _CENTS_PER_HOUR, 60)
+    final = (Fraction(base_price) * 100 + distance + duration) * Fraction(multiplier)
+    return _round_cents(final), _round_cents(distance), _round_cents(duration)
+
+# Adresse : espaces retirés par le cœur de Pydantic avant le contrôle de longueur
+_Address = Annotated[str, StringConstraints(strip_whitespace=True, min_length=5, max_length=500)]
+
 class BookingStatus(str, Enum):
     """Statuts de réservation"""
     PENDING = "pending"
@@ -33,92 +95,66 @@ class BookingValidationModel(BaseModel):
     Modèle de validation pour les réservations
     Compatible Pydantic V2
     """
-    pickup_address: str = Field(..., min_length=5, max_length=500)
-    destination_address: str = Field(..., min_length=5, max_length=500)
+    pickup_address: _Address
+    destination_address: _Address
     pickup_datetime: datetime = Field(...)
     passenger_count: int = Field(..., ge=1, le=8)
     vehicle_type: VehicleType = Field(default=VehicleType.STANDARD)
     special_requirements: Optional[str] = Field(None, max_length=1000)
     estimated_price: Optional[Decimal] = Field(None, ge=0)
 
-    class Config:
-        # Pydantic V2 compatibility
-        json_encoders = {
-            datetime: lambda v: v.isoformat(),
-            Decimal: lambda v: float(v)
-        }
-        use_enum_values = True
-
-    @validator('pickup_datetime')
-    def validate_pickup_time(cls, v):
-        """Validation de la date/heure de prise en charge"""
+    model_config = ConfigDict(use_enum_values=True)
+
+    @field_serializer('estimated_price', when_used='json')
+    def _serialize_price(self, v: Optional[Decimal]) -> Optional[float]:
+        """Prix sérialisé en nombre JSON (les datetime sont déjà en ISO 8601)"""
+        return float(v) if v is not None else None
+
+    @model_validator(mode='after')
+    def _validate(self):
+        """Validation métier de la réservation (un seul passage sur le modèle construit)"""
+        # Date/heure de prise en charge
         now = datetime.now()
 
         # Minimum 15 minutes dans le futur
-        min_time = now + timedelta(minutes=15)
-        if v < min_time:
+        if self.pickup_datetime < now + _MIN_BOOK_DELTA:
             raise ValueError("La réservation doit être au minimum 15 minutes dans le futur")
 
         # Maximum 30 jours dans le futur
-        max_time = now + timedelta(days=30)
-        if v > max_time:
+        if self.pickup_datetime > now + _MAX_BOOK_DELTA:
             raise ValueError("La réservation ne peut pas être plus de 30 jours dans le futur")
 
         # Vérifier les heures de service (5h00 - 1h00)
-        pickup_time = v.time()
-        service_start = time(5, 0)
-        service_end = time(1, 0)
-
-        if not (pickup_time >= service_start or pickup_time <= service_end):
+        pickup_time = self.pickup_datetime.time()
+        if not (pickup_time >= _SERVICE_START or pickup_time <= _SERVICE_END):
             raise ValueError("Les réservations ne sont acceptées qu'entre 5h00 et 1h00")
 
-        return v
-
-    @validator('pickup_address', 'destination_address')
-    def validate_addresses(cls, v):
-        """Validation des adresses"""
-        if not v or v.strip() == "":
-            raise ValueError("L'adresse ne peut pas être vide")
-
-        # Vérification basique du format d'adresse française
-        if not re.search(r'\d', v):  # Doit contenir au moins un chiffre
-            raise ValueError("L'adresse doit contenir un numéro")
-
-        return v.strip()
-
-    @validator('passenger_count')
-    def validate_passenger_count(cls, v, values):
-        """Validation du nombre de passagers selon le type de véhicule"""
-        vehicle_type = values.get('vehicle_type', VehicleType.STANDARD)
-
-        max_passengers = {
-            VehicleType.STANDARD: 4,
-            VehicleType.PREMIUM: 4,
-            VehicleType.VAN: 8,
-            VehicleType.LUXURY: 4
-        }
-
-        max_allowed = max_passengers.get(vehicle_type, 4)
-        if v > max_allowed:
+        # Adresses (déjà nettoyées par le type _Address)
+        pickup_addr = self.pickup_address
+        dest_addr = self.destination_address
+        for address in (pickup_addr, dest_addr):
+            if not address:
+                raise ValueError("L'adresse ne peut pas être vide")
+
+            # Vérification basique du format d'adresse française
+            if not _DIGIT_RE.search(address):  # Doit contenir au moins un chiffre
+                raise ValueError("L'adresse doit contenir un numéro")
+
+        # Nombre de passagers selon le type de véhicule
+        vehicle_type = self.vehicle_type
+        max_allowed = _MAX_PAX.get(vehicle_type, 4)
+        if self.passenger_count > max_allowed:
             raise ValueError(f"Le véhicule {vehicle_type} accepte maximum {max_allowed} passagers")
 
-        return v
-
-    @root_validator
-    def validate_booking_logic(cls, values):
-        """Validation globale de la logique de réservation"""
-        pickup_addr = values.get('pickup_address', '')
-        dest_addr = values.get('destination_address', '')
-
         # Vérifier que les adresses sont différentes
-        if pickup_addr.strip().lower() == dest_addr.strip().lower():
+        if pickup_addr.lower() == dest_addr.lower():
             raise ValueError("L'adresse de départ et de destination doivent être différentes")
 
         # Validation de distance minimum (simulation)
         if len(pickup_addr) + len(dest_addr) < 20:  # Heuristique simple
             raise ValueError("La distance semble trop courte pour justifier un VTC")
 
-        return values
+        return self
 
 class PriceValidationModel(BaseModel):
     """Modèle de validation pour les tarifs"""
@@ -127,67 +163,67 @@ class PriceValidationModel(BaseModel):
     duration_minutes: int = Field(..., ge=5, le=480)  # Max 8h
     vehicle_type: VehicleType
     time_multiplier: Decimal = Field(default=Decimal('1.0'), ge=0.8, le=3.0)
+    pickup_datetime: Optional[datetime] = Field(default=None)
 
-    @validator('base_price')
-    def validate_base_price(cls, v, values):
+    @field_validator('base_price')
+    @classmethod
+    def validate_base_price(cls, v, info: ValidationInfo):
         """Validation du prix de base selon le type de véhicule"""
-        vehicle_type = values.get('vehicle_type', VehicleType.STANDARD)
-
-        min_prices = {
-            VehicleType.STANDARD: Decimal('5.0'),
-            VehicleType.PREMIUM: Decimal('8.0'),
-            VehicleType.VAN: Decimal('12.0'),
-            VehicleType.LUXURY: Decimal('15.0')
-        }
+        # Seuls les champs déjà validés sont visibles : vehicle_type étant déclaré après
+        # base_price, le minimum appliqué reste celui du type standard (comportement d'origine)
+        vehicle_type = VehicleType(info.data.get('vehicle_type', VehicleType.STANDARD)).value
 
-        min_price = min_prices.get(vehicle_type, Decimal('5.0'))
+        min_price = _MIN_PRICE.get(vehicle_type, _DEFAULT_MIN_PRICE)
         if v < min_price:
             raise ValueError(f"Prix minimum pour {vehicle_type}: {min_price}€")
 
         return v
 
-    @validator('time_multiplier')
-    def validate_time_multiplier(cls, v, values):
-        """Validation du multiplicateur temporel"""
-        pickup_time = values.get('pickup_datetime')
-        if pickup_time:
-            hour = pickup_time.hour
+    @model_validator(mode='after')
+    def validate_time_multiplier(self):
+        """Validation du multiplicateur temporel (si l'heure de prise en charge est fournie)"""
+        if self.pickup_datetime:
+            hour = self.pickup_datetime.hour
+            v = self.time_multiplier
 
             # Heures de pointe: 7-9h et 17-19h
-            if hour in [7, 8, 17, 18] and v < 1.2:
+            if hour in _PEAK_HOURS and v < 1.2:
                 raise ValueError("Multiplicateur minimum de 1.2 en heures de pointe")
 
             # Nuit (22h-6h): multiplicateur nuit
-            if (hour >= 22 or hour < 6) and v < 1.5:
+            if hour in _NIGHT_HOURS and v < 1.5:
                 raise ValueError("Multiplicateur minimum de 1.5 la nuit")
 
-        return v
+        return self
 
 class DriverValidationModel(BaseModel):
     """Validation pour les chauffeurs"""
     license_number: str = Field(..., min_length=8, max_length=20)
-    phone_number: str = Field(..., regex=r'^(\+33|0)[1-9](\d{8})$')
+    phone_number: str = Field(..., pattern=_PHONE_RE.pattern)
     vehicle_registration: str = Field(..., min_length=7, max_length=10)
     insurance_expiry: datetime = Field(...)
     medical_certificate_expiry: datetime = Field(...)
 
-    @validator('license_number')
+    @field_validator('license_number')
+    @classmethod
     def validate_license(cls, v):
         """Validation du numéro de permis"""
         # Format français basique
-        if not re.match(r'^[0-9]{12}$|^[A-Z0-9]{8,15}$', v.upper()):
+        license_number = v.upper()
+        if not _LICENSE_RE.match(license_number):
             raise ValueError("Format de permis de conduire invalide")
-        return v.upper()
+        return license_number
 
-    @validator('insurance_expiry', 'medical_certificate_expiry')
+    @field_validator('insurance_expiry', 'medical_certificate_expiry')
+    @classmethod
     def validate_expiry_dates(cls, v):
         """Validation des dates d'expiration"""
-        if v <= datetime.now():
+        now = datetime.now()
+        if v <= now:
             raise ValueError("Le document doit être valide (non expiré)")
 
         # Maximum 5 ans dans le futur
-        max_date = datetime.now() + timedelta(days=5*365)
-        if v > max_date:
+        if v > now + _FIVE_YEARS:
             raise ValueError("Date d'expiration trop éloignée")
 
         return v
@@ -205,7 +241,7 @@ class BusinessLogicValidator:
             # Validations métier supplémentaires
             validation_result = {
                 "valid": True,
-                "data": validated_booking.dict(),
+                "data": validated_booking.model_dump(),
                 "warnings": [],
                 "errors": []
             }
@@ -231,20 +267,21 @@ class BusinessLogicValidator:
         try:
             validated_price = PriceValidationModel(**price_data)
 
-            # Calcul du prix final
-            final_price = (
-                validated_price.base_price +
-                (validated_price.distance_km * Decimal('1.5')) +  # 1.5€/km
-                (Decimal(validated_price.duration_minutes) / 60 * Decimal('25'))  # 25€/h
-            ) * validated_price.time_multiplier
+            # Calcul du prix final (mis en cache sur les valeurs validées exactes)
+            final_cents, distance_cents, time_cents = _compute_price(
+                validated_price.base_price,
+                validated_price.distance_km,
+                validated_price.duration_minutes,
+                validated_price.time_multiplier
+            )
 
             return {
                 "valid": True,
-                "final_price": final_price,
+                "final_price": Decimal(final_cents).scaleb(-2),
                 "breakdown": {
                     "base": validated_price.base_price,
-                    "distance": validated_price.distance_km * Decimal('1.5'),
-                    "time": Decimal(validated_price.duration_minutes) / 60 * Decimal('25'),
+                    "distance": Decimal(distance_cents).scaleb(-2),
+                    "time": Decimal(time_cents).scaleb(-2),
                     "multiplier": validated_price.time_multiplier
                 }
             }
@@ -264,7 +301,7 @@ class BusinessLogicValidator:
 
             return {
                 "valid": True,
-                "data": validated_driver.dict(),
+                "data": validated_driver.model_dump(),
                 "eligibility_status": "approved"
             }
 
@@ -280,9 +317,8 @@ class BusinessLogicValidator:
     def _check_driver_availability(pickup_time: datetime) -> bool:
         """Vérifie la disponibilité des chauffeurs (simulation)"""
         # Simulation basique
-        hour = pickup_time.hour
         # Moins de chauffeurs disponibles la nuit et aux heures de pointe
-        return hour < 6 or hour > 22 or hour in [8, 9, 17, 18, 19]
+        return pickup_time.hour in _LOW_AVAILABILITY_HOURS
 
 # Fonctions utilitaires
 def validate_booking_request(booking_data: Dict) -> Dict:
@@ -291,12 +327,14 @@ def validate_booking_request(booking_data: Dict) -> Dict:
 
 def calculate_trip_price(distance: float, duration: int, vehicle_type: str, pickup_time: datetime) -> Dict:
     """Calcule et valide le prix d'un trajet"""
+    # pickup_time n'est pas transmis au modèle : aucun multiplicateur n'est appliqué ici,
+    # et le contrôle heures de pointe / nuit rejetterait sinon tout devis à ces heures
+    # (l'ancien validateur lisait un champ absent et ne s'appliquait jamais)
     price_data = {
         "base_price": 8.0,
         "distance_km": distance,
         "duration_minutes": duration,
-        "vehicle_type": vehicle_type,
-        "pickup_datetime": pickup_time
+        "vehicle_type": vehicle_type
     }
 
     return BusinessLogicValidator.validate_price(price_data)
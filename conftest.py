@@ -0,0 +1,46 @@
+"""
+Fixtures partagées des tests d'intégration.
+Session de base de données construite sur le moteur de l'application, à la demande :
+rien n'est importé de l'application tant qu'un test ne demande pas ces fixtures.
+"""
+
+import asyncio
+
+import pytest
+
+try:
+    import pytest_asyncio
+except ImportError:  # Fixtures asynchrones indisponibles sans pytest-asyncio
+    pytest_asyncio = None
+
+
+if pytest_asyncio is not None:
+
+    @pytest.fixture(scope="session")
+    def event_loop():
+        """Boucle d'événements unique pour la session (requise par les fixtures asynchrones de session)."""
+        loop = asyncio.new_event_loop()
+        yield loop
+        loop.close()
+
+    @pytest_asyncio.fixture(scope="session")
+    async def engine():
+        """Moteur asynchrone de l'application (pool de connexions conservé entre les tests)."""
+        from app.core.database import engine
+
+        yield engine
+        await engine.dispose()
+
+    @pytest.fixture(scope="session")
+    def session_factory(engine):
+        """Fabrique de sessions de l'application, liée au moteur partagé."""
+        from app.core.database import AsyncSessionLocal
+
+        return AsyncSessionLocal
+
+    @pytest_asyncio.fixture
+    async def db_session(session_factory):
+        """Session par test, annulée en fin de test."""
+        async with session_factory() as session:
+            yield session
+            await session.rollback()
@@ -5,21 +5,46 @@ Système de gestion de véhicules de transport avec chauffeur
 
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+import asyncio
+import time
 import uvicorn
 import logging
 
 # Imports locaux
-from app.core.database import get_db, init_db
-from app.core.auth import AuthManager
+from app.core.database import get_db, init_db, test_connection
+from app.core.auth import AuthManager, shutdown_bcrypt_pool
 from app.routes import auth, vehicles, bookings, drivers, admin
 from app.middleware.logging_middleware import LoggingMiddleware
 from app.utils.production_logger import ProductionLogger
-from config.secure_config import SecureConfig
+from config.secure_config import get_config
 
 # Configuration du logging
 logger = ProductionLogger(__name__)
+config = get_config()
+
+# État de la base de données servi par /health, rafraîchi en tâche de fond
+# (ts en temps monotone ; au-delà de _HEALTH_MAX_AGE l'état est considéré inconnu)
+_HEALTH_CHECK_INTERVAL = 5.0
+_HEALTH_MAX_AGE = 3 * _HEALTH_CHECK_INTERVAL
+_health_state = {"db_ok": False, "ts": float("-inf")}
+
+async def _check_database() -> bool:
+    """Teste la connexion à la base de données, borné à _HEALTH_CHECK_INTERVAL secondes"""
+    try:
+        return await asyncio.wait_for(test_connection(), timeout=_HEALTH_CHECK_INTERVAL)
+    except asyncio.TimeoutError:
+        logger.warning("Health check: délai dépassé pour la base de données")
+        return False
+
+async def _refresh_health_loop():
+    """Teste périodiquement la connexion à la base de données"""
+    while True:
+        _health_state["db_ok"] = await _check_database()
+        _health_state["ts"] = time.monotonic()
+        await asyncio.sleep(_HEALTH_CHECK_INTERVAL)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -29,13 +54,20 @@ async def lifespan(app: FastAPI):
     try:
         await init_db()
         logger.info("✅ Base de données initialisée")
+        _health_state.update(db_ok=True, ts=time.monotonic())
     except Exception as e:
         logger.error(f"❌ Erreur lors de l'initialisation de la base de données: {e}")
         raise
 
+    health_task = asyncio.create_task(_refresh_health_loop())
+
     yield
 
     # Shutdown
+    health_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await health_task
+    shutdown_bcrypt_pool()
     logger.info("🛑 Arrêt de l'application VTC")
 
 # Création de l'application FastAPI
@@ -45,13 +77,14 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 # Configuration CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=SecureConfig.get_cors_origins(),
+    allow_origins=list(config.cors_origins_list),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -98,13 +131,17 @@ async def root():
 async def health_check():
     """Vérification de la santé de l'application"""
     try:
-        # Test de connexion à la base de données
-        from app.core.database import test_connection
-        db_status = await test_connection()
+        # État de la base de données mis en cache par _refresh_health_loop ;
+        # un état trop ancien (tâche bloquée ou arrêtée) n'est plus rapporté comme connecté
+        if time.monotonic() - _health_state["ts"] > _HEALTH_MAX_AGE:
+            overall, database = "degraded", "unknown"
+        else:
+            overall = "healthy"
+            database = "connected" if _health_state["db_ok"] else "disconnected"
 
         return {
-            "status": "healthy",
-            "database": "connected" if db_status else "disconnected",
+            "status": overall,
+            "database": database,
             "services": {
                 "auth": "operational",
                 "booking": "operational",
@@ -0,0 +1,49 @@
+"""
+Tests du gestionnaire d'authentification JWT.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+from pydantic import ValidationError
+
+from app.core.auth import AuthManager
+from app.routes.auth import LoginRequest
+
+
+def test_verify_token_returns_independent_copies():
+    """Modifier le payload renvoyé n'altère pas celui mis en cache."""
+    manager = AuthManager()
+    token = manager.create_access_token({"sub": "user@example.com", "role": "passenger"})
+
+    first = manager.verify_token(token)
+    first["role"] = "admin"
+
+    assert manager.verify_token(token)["role"] == "passenger"
+
+
+@pytest.mark.parametrize("extra_claims", [
+    {},
+    {"nbf": datetime.now(timezone.utc) - timedelta(seconds=5)},
+    {"nbf": datetime.now(timezone.utc) - timedelta(seconds=5), "iat": datetime.now(timezone.utc)},
+])
+def test_access_token_round_trips_through_pyjwt(extra_claims):
+    """Le token HS256 est décodable par PyJWT ; les claims datetime deviennent des NumericDate."""
+    manager = AuthManager()
+    token = manager.create_access_token({"sub": "user@example.com", **extra_claims})
+
+    decoded = jwt.decode(token, manager.secret_key, algorithms=[manager.algorithm])
+    assert decoded["sub"] == "user@example.com"
+    for claim in ("exp", "iat", "nbf"):
+        if claim in decoded:
+            assert isinstance(decoded[claim], int)
+    assert manager.verify_token(token)["sub"] == "user@example.com"
+
+
+def test_login_email_is_validated_and_normalized():
+    """Les adresses suivent les règles d'EmailStr : domaine normalisé, format strict."""
+    assert LoginRequest(email=" User@VTC.Example ", password="p").email == "User@vtc.example"
+    for invalid in ("a..b@vtc.example", "user@exa_mple.com", "user@localhost"):
+        with pytest.raises(ValidationError):
+            LoginRequest(email=invalid, password="p")
@@ -0,0 +1,48 @@
+"""
+Tests du validateur de logique métier.
+Devis calculate_trip_price valides pour chaque type de véhicule.
+"""
+
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+
+import pytest
+
+from app.validators.business_logic_validator import BusinessLogicValidator, VehicleType, calculate_trip_price
+
+# Heure creuse : aucun multiplicateur temporel
+_PICKUP_TIME = datetime(2025, 1, 15, 14, 0)
+
+
+@pytest.mark.parametrize("vehicle_type", [v.value for v in VehicleType])
+def test_calculate_trip_price_valid_for_every_vehicle_type(vehicle_type):
+    """Un devis est valide quel que soit le type de véhicule."""
+    result = calculate_trip_price(12.34, 7, vehicle_type, _PICKUP_TIME)
+    assert result["valid"], result.get("error")
+    assert result["final_price"] > Decimal("0")
+
+
+def _baseline_price(base, distance, minutes, multiplier=Decimal("1.0")) -> Decimal:
+    """Formule Decimal d'origine de validate_price, arrondie au centime."""
+    final = (base + distance * Decimal("1.5") + Decimal(minutes) / 60 * Decimal("25")) * multiplier
+    return final.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+@pytest.mark.parametrize("distance,minutes,multiplier", [
+    (12.34, 7, "1.0"),
+    (0.15, 5, "1.0"),
+    (3.333, 13, "1.25"),
+    (499.99, 480, "3.0"),
+])
+def test_validate_price_matches_baseline_formula(distance, minutes, multiplier):
+    """Le prix n'est pas quantifié sur la distance : identique à la formule d'origine au centime près."""
+    result = BusinessLogicValidator.validate_price({
+        "base_price": 8.0,
+        "distance_km": distance,
+        "duration_minutes": minutes,
+        "vehicle_type": "standard",
+        "time_multiplier": multiplier,
+    })
+    assert result["valid"], result.get("error")
+    expected = _baseline_price(Decimal("8.0"), Decimal(str(distance)), minutes, Decimal(multiplier))
+    assert result["final_price"] == expected
@@ -4,16 +4,27 @@ Validation de toutes les fonctionnalités métier critiques.
 """
 
 import asyncio
-import json
+import collections
+import sys
+import time
 import uuid
-from datetime import datetime, timezone, date
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone, date
 from decimal import Decimal
-from typing import Dict, Any, List
+from functools import cached_property
+from typing import Dict, Any, List, Optional, Tuple
 
+import aiofiles
+import httpx
+import orjson
 import pytest
-from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+try:
+    import uvloop  # Boucle libuv (fournie par uvicorn[standard], absente sous Windows)
+except ImportError:
+    uvloop = None
+
 # Import des modules de l'application
 from app.main_production import app
 from app.core.database.postgresql import get_async_session
@@ -27,21 +38,114 @@ from app.core.logging.production_logger import get_logger
 
 logger = get_logger(__name__)
 
+# Jeux de données d'inscription, indexés par rôle
+_TEST_PASSWORD = "TestPass123!"
+_REGISTRATION_CASES = {
+    "passenger": {
+        "email": "passenger@test.com",
+        "phone": "+213555111111",
+        "first_name": "Ahmed",
+        "last_name": "Benali",
+        "role": UserRole.PASSENGER,
+        "date_of_birth": date(1990, 5, 15)
+    },
+    "driver": {
+        "email": "driver@test.com",
+        "phone": "+213555222222",
+        "first_name": "Fatima",
+        "last_name": "Khelil",
+        "role": UserRole.DRIVER,
+        "date_of_birth": date(1985, 8, 20)
+    }
+}
+_REGISTRATION_LABELS = {
+    "passenger": ("Inscription passager", "Utilisateur créé"),
+    "driver": ("Inscription conducteur", "Conducteur créé")
+}
+
+# Coordonnées et tarif de référence (Alger Centre -> Aéroport Houari Boumediene)
+_PICKUP = (36.7538, 3.0588)
+_DEST = (36.6910, 3.2157)
+_FARE_SAMPLE = Decimal("450.00")
+
+# Libellé de statut d'un résultat de test, indexé par le booléen de succès
+_STATUS = {True: "✅ PASS", False: "❌ FAIL"}
+
+# Tampons (lignes, résultats) propres au test en cours lorsqu'il s'exécute dans un gather ;
+# None hors gather : écriture directe dans les tampons du testeur
+_SINK: ContextVar[Optional[Tuple[List[str], List[tuple]]]] = ContextVar("_SINK", default=None)
+
+# Numéros de course de test : gabarit préconstruit et date du jour calculée une seule fois
+_TRIP_TEMPLATE = "TR{date}{suffix}".format_map
+_TODAY_STR = date.today().strftime("%Y%m%d")
+
+
+def _registration_request(role_key: str) -> UserRegistrationRequest:
+    """Construit la demande d'inscription de test pour un rôle."""
+    return UserRegistrationRequest(password=_TEST_PASSWORD, **_REGISTRATION_CASES[role_key])
+
+
+def _check_registration(user: User, token: str, role: UserRole):
+    """Vérifications communes après inscription."""
+    assert user.role == role
+    assert token is not None
+    if role == UserRole.DRIVER:
+        assert user.age >= 21  # Âge minimum conducteur
+    else:
+        assert user.status == UserStatus.PENDING
+
+
+def _check_estimate(estimate: Dict[str, Any]):
+    """Vérifications communes d'une estimation de course."""
+    assert "distance_km" in estimate
+    assert "estimated_fare" in estimate
+    assert estimate["distance_km"] > 0
+    assert estimate["estimated_fare"] > 0
+
+
+def _trip_create_request(passenger: User) -> TripCreateRequest:
+    """Construit la demande de création de course de test pour un passager."""
+    return TripCreateRequest(
+        passenger_id=str(passenger.id),
+        pickup_latitude=_PICKUP[0],
+        pickup_longitude=_PICKUP[1],
+        pickup_address="Alger Centre, Place des Martyrs",
+        destination_latitude=_DEST[0],
+        destination_longitude=_DEST[1],
+        destination_address="Aéroport Houari Boumediene",
+        trip_type=TripType.STANDARD,
+        special_requests="Véhicule climatisé"
+    )
+
+
 class Phase2IntegrationTester:
     """Testeur d'intégration pour la Phase 2."""
     
     def __init__(self):
-        self.client = TestClient(app)
-        self.trip_service = TripServiceAdvanced()
-        self.user_service = UserServiceAdvanced()
-        self.location_service = LocationServiceAdvanced()
+        # Client HTTP asynchrone branché directement sur l'application ASGI (ne bloque pas la boucle)
+        self.aclient = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
         
         # Données de test
         self.test_users = {}
         self.test_trips = {}
         self.test_tokens = {}
         
-        # Résultats des tests
+        # Horodatage de référence : chaque résultat ne stocke qu'un écart monotone
+        self._t0 = datetime.now(timezone.utc)
+        self._t0_ns = time.monotonic_ns()
+        
+        # Durées (s) mesurées sur les appels déjà effectués, relues par test_performance
+        self._perf: Dict[str, float] = {}
+        
+        # Lignes de progression, écrites en une seule fois dans le rapport final
+        # (un print par résultat bloquerait la boucle d'événements sur un stdout redirigé)
+        self._log_buf: List[str] = []
+        
+        # Résultats des tests : tuples (nom, succès, détails, ts_ns) et compteurs entiers,
+        # convertis en dictionnaires une seule fois par generate_final_report
+        self._details = collections.deque()
+        self._passed = 0
+        self._failed = 0
         self.test_results = {
             "total_tests": 0,
             "passed_tests": 0,
@@ -49,12 +153,29 @@ class Phase2IntegrationTester:
             "test_details": []
         }
     
+    # === SERVICES (construits à la première utilisation) ===
+    
+    @cached_property
+    def trip_service(self) -> TripServiceAdvanced:
+        """Service de courses."""
+        return TripServiceAdvanced()
+    
+    @cached_property
+    def user_service(self) -> UserServiceAdvanced:
+        """Service utilisateur."""
+        return UserServiceAdvanced()
+    
+    @cached_property
+    def location_service(self) -> LocationServiceAdvanced:
+        """Service de géolocalisation."""
+        return LocationServiceAdvanced()
+    
     async def run_all_tests(self) -> Dict[str, Any]:
         """Exécute tous les tests d'intégration."""
-        print("🧪 DÉMARRAGE DES TESTS D'INTÉGRATION PHASE 2")
-        print("=" * 60)
+        self._log_buf += ("🧪 DÉMARRAGE DES TESTS D'INTÉGRATION PHASE 2", "=" * 60)
         
         try:
+            # Phase A : tests producteurs des données partagées (utilisateurs, courses)
             # 1. Tests de base de données et modèles
             await self.test_database_models()
             
@@ -64,24 +185,31 @@ class Phase2IntegrationTester:
             # 3. Tests des services de courses
             await self.test_trip_services()
             
-            # 4. Tests de géolocalisation
-            await self.test_location_services()
-            
-            # 5. Tests WebSocket
-            await self.test_websocket_services()
-            
-            # 6. Tests d'API REST
-            await self.test_api_endpoints()
-            
-            # 7. Tests de workflow complet
-            await self.test_complete_workflow()
-            
-            # 8. Tests de performance
-            await self.test_performance()
+            # Un seul contexte (pool HTTP) du service de géolocalisation pour toute la phase B
+            async with self.location_service:
+                # Phase B : tests indépendants, exécutés en parallèle pour recouvrir leurs attentes I/O
+                # 4. Géolocalisation, 5. WebSocket, 6. API REST
+                # Chaque test remplit ses propres tampons, fusionnés ensuite dans l'ordre ci-dessous
+                buffers = await asyncio.gather(
+                    self._isolated(self.test_location_services),
+                    self._isolated(self.test_websocket_services),
+                    self._isolated(self.test_api_endpoints)
+                )
+                for lines, details in buffers:
+                    self._log_buf += lines
+                    self._details += details
+                
+                # 7. Tests de workflow complet
+                await self.test_complete_workflow()
+                
+                # 8. Tests de performance (seuls, pour ne pas fausser les mesures)
+                await self.test_performance()
             
         except Exception as e:
             logger.error(f"Erreur lors des tests: {e}")
             self.add_test_result("ERREUR_GLOBALE", False, str(e))
+        finally:
+            await self.aclient.aclose()
         
         return self.generate_final_report()
     
@@ -89,12 +217,14 @@ class Phase2IntegrationTester:
     
     async def test_database_models(self):
         """Tests des modèles de base de données."""
-        print("\n📊 Tests des modèles de base de données...")
+        self._log("\n📊 Tests des modèles de base de données...")
         
         try:
             async with get_async_session() as db:
-                # Test création utilisateur
+                # Test création utilisateur (identifiants générés côté client : la course est liée
+                # avant l'INSERT et le flush unique n'a aucune clé primaire à relire)
                 user = User(
+                    id=uuid.uuid4(),
                     email="test@example.com",
                     phone="+213555123456",
                     first_name="Test",
@@ -104,36 +234,34 @@ class Phase2IntegrationTester:
                 )
                 user.user_number = user.generate_user_number()
                 
-                db.add(user)
-                await db.flush()
-                
-                # Vérifications
-                assert user.id is not None
-                assert user.full_name == "Test User"
-                assert user.is_active == False  # Pending par défaut
-                assert user.can_request_trip() == False  # Email non vérifié
-                
-                self.add_test_result("Création utilisateur", True, "Modèle User fonctionnel")
-                
                 # Test création course
                 trip = Trip(
-                    trip_number="TR20241201TEST",
+                    id=uuid.uuid4(),
+                    trip_number=_TRIP_TEMPLATE({"date": _TODAY_STR, "suffix": "TEST"}),
                     passenger_id=user.id,
-                    pickup_latitude=36.7538,
-                    pickup_longitude=3.0588,
+                    pickup_latitude=_PICKUP[0],
+                    pickup_longitude=_PICKUP[1],
                     pickup_address="Alger Centre",
-                    destination_latitude=36.6910,
-                    destination_longitude=3.2157,
+                    destination_latitude=_DEST[0],
+                    destination_longitude=_DEST[1],
                     destination_address="Aéroport Houari Boumediene",
                     trip_type=TripType.STANDARD,
                     estimated_distance_km=25.5,
                     estimated_duration_minutes=35,
-                    estimated_fare=Decimal("450.00")
+                    estimated_fare=_FARE_SAMPLE
                 )
                 
-                db.add(trip)
+                db.add_all([user, trip])
                 await db.flush()
                 
+                # Vérifications
+                assert user.id is not None
+                assert user.full_name == "Test User"
+                assert user.is_active == False  # Pending par défaut
+                assert user.can_request_trip() == False  # Email non vérifié
+                
+                self.add_test_result("Création utilisateur", True, "Modèle User fonctionnel")
+                
                 # Vérifications
                 assert trip.id is not None
                 assert trip.is_active == True
@@ -150,54 +278,25 @@ class Phase2IntegrationTester:
     
     async def test_user_services(self):
         """Tests des services utilisateur avancés."""
-        print("\n👤 Tests des services utilisateur...")
+        self._log("\n👤 Tests des services utilisateur...")
         
         try:
             async with get_async_session() as db:
-                # Test inscription passager
-                passenger_request = UserRegistrationRequest(
-                    email="passenger@test.com",
-                    phone="+213555111111",
-                    password="TestPass123!",
-                    first_name="Ahmed",
-                    last_name="Benali",
-                    role=UserRole.PASSENGER,
-                    date_of_birth=date(1990, 5, 15)
-                )
-                
-                passenger, token = await self.user_service.register_user(passenger_request, db)
-                self.test_users["passenger"] = passenger
-                self.test_tokens["passenger"] = token
-                
-                assert passenger.role == UserRole.PASSENGER
-                assert passenger.status == UserStatus.PENDING
-                assert token is not None
-                
-                self.add_test_result("Inscription passager", True, f"Utilisateur créé: {passenger.user_number}")
-                
-                # Test inscription conducteur
-                driver_request = UserRegistrationRequest(
-                    email="driver@test.com",
-                    phone="+213555222222",
-                    password="TestPass123!",
-                    first_name="Fatima",
-                    last_name="Khelil",
-                    role=UserRole.DRIVER,
-                    date_of_birth=date(1985, 8, 20)
-                )
-                
-                driver, driver_token = await self.user_service.register_user(driver_request, db)
-                self.test_users["driver"] = driver
-                self.test_tokens["driver"] = driver_token
-                
-                assert driver.role == UserRole.DRIVER
-                assert driver.age >= 21  # Âge minimum conducteur
+                # Test inscription passager puis conducteur
+                for role_key, (label, message) in _REGISTRATION_LABELS.items():
+                    user, token = await self.user_service.register_user(_registration_request(role_key), db)
+                    self.test_users[role_key] = user
+                    self.test_tokens[role_key] = token
+                    
+                    _check_registration(user, token, _REGISTRATION_CASES[role_key]["role"])
+                    
+                    self.add_test_result(label, True, f"{message}: {user.user_number}")
                 
-                self.add_test_result("Inscription conducteur", True, f"Conducteur créé: {driver.user_number}")
+                passenger = self.test_users["passenger"]
                 
                 # Test authentification
                 auth_user, auth_token = await self.user_service.authenticate_user(
-                    "passenger@test.com", "TestPass123!", db
+                    _REGISTRATION_CASES["passenger"]["email"], _TEST_PASSWORD, db
                 )
                 
                 assert auth_user.id == passenger.id
@@ -220,44 +319,31 @@ class Phase2IntegrationTester:
     
     async def test_trip_services(self):
         """Tests des services de courses avancés."""
-        print("\n🚗 Tests des services de courses...")
+        self._log("\n🚗 Tests des services de courses...")
         
         try:
             async with get_async_session() as db:
                 # Test estimation de course
                 estimate_request = TripEstimateRequest(
-                    pickup_latitude=36.7538,
-                    pickup_longitude=3.0588,
-                    destination_latitude=36.6910,
-                    destination_longitude=3.2157,
+                    pickup_latitude=_PICKUP[0],
+                    pickup_longitude=_PICKUP[1],
+                    destination_latitude=_DEST[0],
+                    destination_longitude=_DEST[1],
                     trip_type=TripType.STANDARD
                 )
                 
-                estimate = await self.trip_service.estimate_trip(estimate_request, db)
+                estimate = await self._timed("estimate_s", self.trip_service.estimate_trip(estimate_request, db))
                 
-                assert "distance_km" in estimate
-                assert "estimated_fare" in estimate
-                assert estimate["distance_km"] > 0
-                assert estimate["estimated_fare"] > 0
+                _check_estimate(estimate)
                 
                 self.add_test_result("Estimation de course", True, 
                     f"Distance: {estimate['distance_km']}km, Prix: {estimate['estimated_fare']}DZD")
                 
                 # Test création de course (nécessite un utilisateur)
                 if "passenger" in self.test_users:
-                    create_request = TripCreateRequest(
-                        passenger_id=str(self.test_users["passenger"].id),
-                        pickup_latitude=36.7538,
-                        pickup_longitude=3.0588,
-                        pickup_address="Alger Centre, Place des Martyrs",
-                        destination_latitude=36.6910,
-                        destination_longitude=3.2157,
-                        destination_address="Aéroport Houari Boumediene",
-                        trip_type=TripType.STANDARD,
-                        special_requests="Véhicule climatisé"
+                    trip = await self.trip_service.create_trip(
+                        _trip_create_request(self.test_users["passenger"]), db
                     )
-                    
-                    trip = await self.trip_service.create_trip(create_request, db)
                     self.test_trips["main"] = trip
                     
                     assert trip.status == TripStatus.REQUESTED
@@ -300,69 +386,70 @@ class Phase2IntegrationTester:
     
     async def test_location_services(self):
         """Tests des services de géolocalisation."""
-        print("\n🗺️ Tests de géolocalisation...")
+        self._log("\n🗺️ Tests de géolocalisation...")
         
         try:
-            async with self.location_service:
-                # Test calcul de route
-                route = await self.location_service.calculate_route(
-                    origin=(36.7538, 3.0588),  # Alger Centre
-                    destination=(36.6910, 3.2157)  # Aéroport
+            # Requêtes indépendantes (route, géocodage, ETA) lancées en parallèle
+            route, location, eta = await asyncio.gather(
+                self.location_service.calculate_route(
+                    origin=_PICKUP,  # Alger Centre
+                    destination=_DEST  # Aéroport
+                ),
+                self.location_service.geocode_address("Alger Centre, Algérie"),
+                self.location_service.calculate_eta(
+                    _PICKUP,
+                    (36.7600, 3.0650)
                 )
+            )
+            
+            # Test calcul de route
+            assert route.distance_km > 0
+            assert route.duration_minutes > 0
+            
+            self.add_test_result("Calcul de route", True, 
+                f"Route calculée: {route.distance_km}km en {route.duration_minutes}min")
+            
+            # Test géocodage
+            if location:
+                assert abs(location.latitude - _PICKUP[0]) < 0.1
+                assert abs(location.longitude - _PICKUP[1]) < 0.1
                 
-                assert route.distance_km > 0
-                assert route.duration_minutes > 0
-                
-                self.add_test_result("Calcul de route", True, 
-                    f"Route calculée: {route.distance_km}km en {route.duration_minutes}min")
+                self.add_test_result("Géocodage", True, 
+                    f"Adresse géocodée: {location.latitude}, {location.longitude}")
+            else:
+                self.add_test_result("Géocodage", True, "Service de géocodage accessible")
+            
+            # Test mise à jour position conducteur
+            if "driver" in self.test_users:
+                success = await self.location_service.update_driver_location(
+                    str(self.test_users["driver"].id),
+                    *_PICKUP,
+                    heading=45.0,
+                    speed_kmh=30.0,
+                    is_available=True
+                )
                 
-                # Test géocodage
-                location = await self.location_service.geocode_address("Alger Centre, Algérie")
-                if location:
-                    assert abs(location.latitude - 36.7538) < 0.1
-                    assert abs(location.longitude - 3.0588) < 0.1
-                    
-                    self.add_test_result("Géocodage", True, 
-                        f"Adresse géocodée: {location.latitude}, {location.longitude}")
-                else:
-                    self.add_test_result("Géocodage", True, "Service de géocodage accessible")
+                assert success == True
                 
-                # Test mise à jour position conducteur
-                if "driver" in self.test_users:
-                    success = await self.location_service.update_driver_location(
-                        str(self.test_users["driver"].id),
-                        36.7538, 3.0588,
-                        heading=45.0,
-                        speed_kmh=30.0,
-                        is_available=True
-                    )
-                    
-                    assert success == True
-                    
-                    self.add_test_result("Position conducteur", True, 
-                        "Position mise à jour avec succès")
-                    
-                    # Test recherche conducteurs proches
-                    nearby_drivers = await self.location_service.find_nearby_drivers(
-                        36.7538, 3.0588, radius_km=5.0
-                    )
-                    
-                    assert isinstance(nearby_drivers, list)
-                    
-                    self.add_test_result("Recherche conducteurs", True, 
-                        f"{len(nearby_drivers)} conducteur(s) trouvé(s)")
+                self.add_test_result("Position conducteur", True, 
+                    "Position mise à jour avec succès")
                 
-                # Test calcul ETA
-                eta = await self.location_service.calculate_eta(
-                    (36.7538, 3.0588),
-                    (36.7600, 3.0650)
+                # Test recherche conducteurs proches
+                nearby_drivers = await self.location_service.find_nearby_drivers(
+                    *_PICKUP, radius_km=5.0
                 )
                 
-                assert eta > 0
-                assert eta < 120  # Maximum 2 heures
-                
-                self.add_test_result("Calcul ETA", True, f"ETA calculé: {eta} minutes")
+                assert isinstance(nearby_drivers, list)
                 
+                self.add_test_result("Recherche conducteurs", True, 
+                    f"{len(nearby_drivers)} conducteur(s) trouvé(s)")
+            
+            # Test calcul ETA
+            assert eta > 0
+            assert eta < 120  # Maximum 2 heures
+            
+            self.add_test_result("Calcul ETA", True, f"ETA calculé: {eta} minutes")
+            
         except Exception as e:
             self.add_test_result("Services de géolocalisation", False, str(e))
     
@@ -370,7 +457,7 @@ class Phase2IntegrationTester:
     
     async def test_websocket_services(self):
         """Tests des services WebSocket."""
-        print("\n🔌 Tests WebSocket...")
+        self._log("\n🔌 Tests WebSocket...")
         
         try:
             # Test gestionnaire WebSocket
@@ -401,25 +488,25 @@ class Phase2IntegrationTester:
     
     async def test_api_endpoints(self):
         """Tests des endpoints API REST."""
-        print("\n🌐 Tests des endpoints API...")
+        self._log("\n🌐 Tests des endpoints API...")
         
         try:
             # Test endpoint de santé
-            response = self.client.get("/health")
+            response = await self.aclient.get("/health")
             assert response.status_code == 200
             
             self.add_test_result("Endpoint santé", True, "API accessible")
             
             # Test estimation sans authentification
             estimate_data = {
-                "pickup_latitude": 36.7538,
-                "pickup_longitude": 3.0588,
-                "destination_latitude": 36.6910,
-                "destination_longitude": 3.2157,
+                "pickup_latitude": _PICKUP[0],
+                "pickup_longitude": _PICKUP[1],
+                "destination_latitude": _DEST[0],
+                "destination_longitude": _DEST[1],
                 "trip_type": "STANDARD"
             }
             
-            response = self.client.post("/api/v1/trips/estimate", json=estimate_data)
+            response = await self.aclient.post("/api/v1/trips/estimate", json=estimate_data)
             # Peut échouer sans authentification, c'est normal
             
             self.add_test_result("Endpoint estimation", True, 
@@ -429,7 +516,7 @@ class Phase2IntegrationTester:
             if "passenger" in self.test_tokens:
                 headers = {"Authorization": f"Bearer {self.test_tokens['passenger']}"}
                 
-                response = self.client.get("/api/v1/trips/my-trips", headers=headers)
+                response = await self.aclient.get("/api/v1/trips/my-trips", headers=headers)
                 # Peut échouer selon la configuration, mais l'endpoint doit être accessible
                 
                 self.add_test_result("Endpoint authentifié", True, 
@@ -442,7 +529,7 @@ class Phase2IntegrationTester:
     
     async def test_complete_workflow(self):
         """Tests du workflow complet de course."""
-        print("\n🔄 Tests du workflow complet...")
+        self._log("\n🔄 Tests du workflow complet...")
         
         try:
             # Simulation d'un workflow complet
@@ -483,77 +570,98 @@ class Phase2IntegrationTester:
     
     async def test_performance(self):
         """Tests de performance basiques."""
-        print("\n⚡ Tests de performance...")
+        self._log("\n⚡ Tests de performance...")
         
         try:
-            import time
-            
-            # Test performance estimation
-            start_time = time.time()
-            
-            async with get_async_session() as db:
-                estimate_request = TripEstimateRequest(
-                    pickup_latitude=36.7538,
-                    pickup_longitude=3.0588,
-                    destination_latitude=36.6910,
-                    destination_longitude=3.2157
-                )
-                
-                estimate = await self.trip_service.estimate_trip(estimate_request, db)
-            
-            estimation_time = time.time() - start_time
+            # Durée relevée lors de l'estimation du test de courses (phase A, séquentielle)
+            estimation_time = self._perf["estimate_s"]
             
             assert estimation_time < 5.0  # Moins de 5 secondes
             
             self.add_test_result("Performance estimation", True, 
                 f"Estimation en {estimation_time:.2f}s")
             
-            # Test performance géolocalisation
-            start_time = time.time()
-            
-            async with self.location_service:
-                route = await self.location_service.calculate_route(
-                    (36.7538, 3.0588), (36.6910, 3.2157)
-                )
-            
-            route_time = time.time() - start_time
+            # Le calcul de route du test de géolocalisation s'exécute en parallèle d'autres tests :
+            # sa durée y serait faussée, il est donc chronométré ici, seul
+            await self._timed("route_s", self.location_service.calculate_route(_PICKUP, _DEST))
+            route_time = self._perf["route_s"]
             
             assert route_time < 10.0  # Moins de 10 secondes
             
             self.add_test_result("Performance géolocalisation", True, 
                 f"Calcul de route en {route_time:.2f}s")
             
+        except KeyError as e:
+            self.add_test_result("Tests de performance", False, f"Mesure absente: {e}")
         except Exception as e:
             self.add_test_result("Tests de performance", False, str(e))
     
     # === MÉTHODES UTILITAIRES ===
     
+    async def _timed(self, key: str, awaitable):
+        """Attend un appel et enregistre sa durée dans self._perf[key]."""
+        t0 = time.perf_counter()
+        result = await awaitable
+        self._perf[key] = time.perf_counter() - t0
+        return result
+    
+    async def _isolated(self, test) -> Tuple[List[str], List[tuple]]:
+        """Exécute un test avec ses propres tampons de lignes et de résultats, et les renvoie."""
+        sink = ([], [])
+        _SINK.set(sink)  # contexte propre à la tâche créée par gather
+        try:
+            await test()
+        except Exception as e:
+            self.add_test_result("ERREUR_PARALLELE", False, str(e))
+        return sink
+    
+    def _sink(self) -> Tuple[List[str], Any]:
+        """Tampons (lignes, résultats) où écrit le test en cours."""
+        return _SINK.get() or (self._log_buf, self._details)
+    
+    def _log(self, line: str):
+        """Ajoute une ligne de progression."""
+        self._sink()[0].append(line)
+    
     def add_test_result(self, test_name: str, success: bool, details: str):
         """Ajoute un résultat de test."""
-        self.test_results["total_tests"] += 1
-        
         if success:
-            self.test_results["passed_tests"] += 1
-            status = "✅ PASS"
+            self._passed += 1
         else:
-            self.test_results["failed_tests"] += 1
-            status = "❌ FAIL"
+            self._failed += 1
         
-        result = {
-            "test_name": test_name,
-            "status": status,
-            "success": success,
-            "details": details,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
+        lines, results = self._sink()
+        results.append((test_name, success, details, time.monotonic_ns() - self._t0_ns))
         
-        self.test_results["test_details"].append(result)
-        
-        print(f"  {status} {test_name}: {details}")
+        lines.append(f"  {_STATUS[success]} {test_name}: {details}")
     
     def generate_final_report(self) -> Dict[str, Any]:
         """Génère le rapport final des tests."""
-        success_rate = (self.test_results["passed_tests"] / self.test_results["total_tests"]) * 100 if self.test_results["total_tests"] > 0 else 0
+        # Vidage du tampon de progression : une seule écriture sur stdout
+        if self._log_buf:
+            sys.stdout.write("\n".join(self._log_buf) + "\n")
+            self._log_buf.clear()
+        
+        # Matérialisation des résultats en une seule passe ; les écarts monotones deviennent
+        # des datetime UTC (orjson les sérialise nativement en RFC 3339, sans isoformat())
+        total = self._passed + self._failed
+        self.test_results = {
+            "total_tests": total,
+            "passed_tests": self._passed,
+            "failed_tests": self._failed,
+            "test_details": [
+                {
+                    "test_name": name,
+                    "status": _STATUS[success],
+                    "success": success,
+                    "details": details,
+                    "timestamp": self._t0 + timedelta(microseconds=ts_ns // 1000)
+                }
+                for name, success, details, ts_ns in self._details
+            ]
+        }
+        
+        success_rate = (self._passed / total) * 100 if total > 0 else 0
         
         report = {
             "phase": "Phase 2 - Fonctionnalités Métier Critiques",
@@ -576,7 +684,7 @@ class Phase2IntegrationTester:
             "test_details": self.test_results["test_details"],
             "overall_status": "SUCCESS" if success_rate >= 80 else "PARTIAL" if success_rate >= 60 else "FAILED",
             "recommendations": self._generate_recommendations(success_rate),
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": datetime.now(timezone.utc)
         }
         
         return report
@@ -625,8 +733,8 @@ async def main():
             print(f"  {rec}")
         
         # Sauvegarder le rapport
-        with open("/home/ubuntu/phase2_test_report.json", "w") as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        async with aiofiles.open("/home/ubuntu/phase2_test_report.json", "wb") as f:
+            await f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         print(f"\n💾 Rapport sauvegardé: /home/ubuntu/phase2_test_report.json")
         
@@ -637,6 +745,11 @@ async def main():
         return {"error": str(e)}
 
 if __name__ == "__main__":
-    # Exécuter les tests
-    asyncio.run(main())
+    # Exécuter les tests (boucle uvloop si disponible ; uvloop.run n'existe qu'à partir de 0.18)
+    if uvloop is not None and hasattr(uvloop, "run"):
+        uvloop.run(main())
+    else:
+        if uvloop is not None:
+            uvloop.install()
+        asyncio.run(main())
 